@@ -4,7 +4,9 @@ from loopforge.states import (
     LoopState,
     LoopTransition,
     LoopRecord,
+    LoopRecordView,
     VALID_TRANSITIONS,
+    VALID_TRANSITIONS_SET,
     create_record,
 )
 from loopforge.service import (
@@ -20,7 +22,9 @@ __all__ = [
     "LoopState",
     "LoopTransition",
     "LoopRecord",
+    "LoopRecordView",
     "VALID_TRANSITIONS",
+    "VALID_TRANSITIONS_SET",
     "create_record",
     # Service
     "LoopService",
@@ -13,30 +13,97 @@ Usage:
 
 import logging
 import os
-from typing import Any, Optional
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Literal, Optional, Union, overload
 
-from loopforge.states import LoopRecord
+from loopforge.states import LoopRecord, LoopRecordView, LoopState, LoopTransition
 
 logger = logging.getLogger(__name__)
 
 try:
     import boto3
+    from boto3.dynamodb.types import TypeSerializer
+    from botocore.config import Config
     from botocore.exceptions import ClientError
 except ImportError:
     raise ImportError("boto3 is required for the DynamoDB adapter. Install it with: pip install loopforge[dynamodb]")
 
+# DynamoDB rejects BatchWriteItem requests with more than 25 put/delete requests.
+MAX_DYNAMO_BATCH_WRITE_ITEM_COUNT = 25
+
+# DynamoDB rejects BatchGetItem requests for more than 100 keys.
+MAX_DYNAMO_BATCH_GET_ITEM_COUNT = 100
+
+# Retry schedule for UnprocessedItems returned by BatchWriteItem
+# (also used for UnprocessedKeys returned by BatchGetItem).
+BATCH_WRITE_MAX_RETRIES = 8
+BATCH_WRITE_BACKOFF_BASE = 0.05
+BATCH_WRITE_BACKOFF_MAX = 5.0
+
+# Chunks queued per worker in a parallel save_many(); caps in-flight requests.
+BATCH_WRITE_CHUNKS_PER_WORKER = 2
+
+# Client defaults for many small requests: keep connections alive and pooled,
+# fail fast on connect, and let adaptive retries rate-limit under throttling
+# (they back off on ThrottlingException / ProvisionedThroughputExceeded rather
+# than surfacing it). urllib3 already sets TCP_NODELAY on botocore sockets.
+DEFAULT_CLIENT_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=32,
+    connect_timeout=1,
+    read_timeout=5,
+    retries={"mode": "adaptive", "total_max_attempts": 10},
+)
+
+# Sort key values: one header item per record plus one item per transition.
+META_PART = "meta"
+TRANSITION_PART_PREFIX = "txn#"
+
+
+def _transition_part(index: int) -> str:
+    """Sort key for the index-th transition; zero-padded so items sort in order."""
+    return f"{TRANSITION_PART_PREFIX}{index:08d}"
+
 
 class DynamoDBRepository:
     """
     DynamoDB-backed repository for LoopRecords.
 
+    Each record is stored as a header item plus one item per transition,
+    so appending a transition writes a single small item instead of
+    rewriting the whole (ever-growing) history.
+
     Table schema:
         Partition key: record_id (S)
+        Sort key: part (S)
+            "meta"            record header (everything except transitions,
+                              plus transition_count)
+            "txn#<index>"     one transition, index zero-padded to 8 digits
 
-    Optional GSI for state queries:
+    Transition indexes are absolute: when LoopService trims a record's
+    recent history (max_recent_transitions), the older items simply stay
+    in the partition as the archive, and get()/list_by_state() only read
+    the range from txn#<archived_transitions> onwards.
+
+    Optional GSI for state queries (sparse: only header items carry state):
         GSI name: state-index
         Partition key: state (S)
         Sort key: updated_at (S)
+
+    Bulk writes via save_many() are chunked into BatchWriteItem calls of
+    max_batch_size items (25 on DynamoDB; DynamoDB-compatible stores such
+    as ScyllaDB Alternator allow larger batches). With max_workers > 1 the
+    chunks are fanned out across a thread pool. Batch writes go through
+    the resource's low-level client, which is thread-safe, so the workers
+    share its endpoint, credentials and connection pool.
+
+    Resources created by the repository use DEFAULT_CLIENT_CONFIG
+    (keep-alive, pooled connections, adaptive retries); pass config to
+    override individual settings. A client passed in is used as-is.
     """
 
     STATE_INDEX = "state-index"
@@ -46,61 +113,444 @@ class DynamoDBRepository:
         table_name: Optional[str] = None,
         region_name: Optional[str] = None,
         client: Optional[Any] = None,
+        max_batch_size: int = MAX_DYNAMO_BATCH_WRITE_ITEM_COUNT,
+        config: Optional[Config] = None,
     ) -> None:
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
         self._table_name = table_name or os.environ.get("LOOPFORGE_TABLE", "loopforge")
         self._region_name = region_name
         self._client = client
         self._table = None
+        self._max_batch_size = max_batch_size
+        self._serializer = TypeSerializer()
+        self._config = DEFAULT_CLIENT_CONFIG.merge(config) if config is not None else DEFAULT_CLIENT_CONFIG
+
+    def _resource(self) -> Any:
+        """The shared service resource, created on first use."""
+        if self._client is None:
+            kwargs = {}
+            if self._region_name:
+                kwargs["region_name"] = self._region_name
+            self._client = boto3.resource("dynamodb", config=self._config, **kwargs)
+        return self._client
 
     @property
     def table(self) -> Any:
         if self._table is None:
-            if self._client is None:
-                kwargs = {}
-                if self._region_name:
-                    kwargs["region_name"] = self._region_name
-                self._client = boto3.resource("dynamodb", **kwargs)
-            self._table = self._client.Table(self._table_name)
+            self._table = self._resource().Table(self._table_name)
         return self._table
 
+    @staticmethod
+    def _meta_item(record: LoopRecord) -> dict[str, Any]:
+        item = record.to_dict()
+        del item["transitions"]
+        item["part"] = META_PART
+        item["transition_count"] = record.archived_transitions + len(record.transitions)
+        return item
+
+    @staticmethod
+    def _transition_item(record_id: str, index: int, transition: LoopTransition) -> dict[str, Any]:
+        return {"record_id": record_id, "part": _transition_part(index), **transition.to_dict()}
+
+    @staticmethod
+    def _header_data(meta: dict[str, Any]) -> dict[str, Any]:
+        return {k: v for k, v in meta.items() if k not in ("part", "transition_count")}
+
+    @classmethod
+    def _assemble(cls, meta: dict[str, Any], transition_items: list[dict[str, Any]]) -> LoopRecord:
+        data = cls._header_data(meta)
+        data["transitions"] = [{k: v for k, v in t.items() if k not in ("record_id", "part")} for t in transition_items]
+        return LoopRecord.from_dict(data)
+
+    def _record_items(self, record: LoopRecord, from_index: int = 0) -> list[dict[str, Any]]:
+        """Transition items from absolute index from_index onwards, followed by the header item."""
+        start = max(from_index, record.archived_transitions)
+        items = [
+            self._transition_item(record.record_id, index, transition)
+            for index, transition in enumerate(record.transitions[start - record.archived_transitions :], start=start)
+        ]
+        items.append(self._meta_item(record))
+        return items
+
+    def _query_partition(
+        self, record_id: str, between: Optional[tuple[str, str]] = None, keys_only: bool = False
+    ) -> list[dict]:
+        """All items for a record (optionally only sort keys in an inclusive range), following pagination."""
+        kwargs: dict[str, Any] = {
+            "KeyConditionExpression": "record_id = :id",
+            "ExpressionAttributeValues": {":id": record_id},
+        }
+        if between is not None:
+            kwargs["KeyConditionExpression"] += " AND #p BETWEEN :first AND :last"
+            kwargs["ExpressionAttributeNames"] = {"#p": "part"}
+            kwargs["ExpressionAttributeValues"][":first"], kwargs["ExpressionAttributeValues"][":last"] = between
+        if keys_only:
+            kwargs["ProjectionExpression"] = "record_id, #p"
+            kwargs["ExpressionAttributeNames"] = {"#p": "part"}
+
+        items: list[dict] = []
+        while True:
+            response = self.table.query(**kwargs)
+            items.extend(response.get("Items", []))
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return items
+            kwargs["ExclusiveStartKey"] = last_key
+
+    def _query_transitions(self, record_id: str, first: int, stop: int) -> list[dict]:
+        """Transition items with absolute indexes in [first, stop)."""
+        if first >= stop:
+            return []
+        return self._query_partition(record_id, between=(_transition_part(first), _transition_part(stop - 1)))
+
+    def _hydrate(self, meta: dict[str, Any]) -> LoopRecord:
+        """Assemble a record from its header, loading only its recent (unarchived) transitions."""
+        first = int(meta.get("archived_transitions", 0))
+        stop = int(meta.get("transition_count", 0))
+        return self._assemble(meta, self._query_transitions(meta["record_id"], first, stop))
+
+    def _hydrate_many(self, metas: list[dict[str, Any]]) -> list[LoopRecord]:
+        """
+        Assemble several records from their headers.
+
+        The headers say exactly which transition items exist, so they are
+        fetched by key with BatchGetItem, up to 100 per round-trip, rather
+        than with one partition query per record.
+        """
+        keys = [
+            {"record_id": meta["record_id"], "part": _transition_part(index)}
+            for meta in metas
+            for index in range(int(meta.get("archived_transitions", 0)), int(meta.get("transition_count", 0)))
+        ]
+        by_record: dict[str, list[dict[str, Any]]] = {meta["record_id"]: [] for meta in metas}
+        for start in range(0, len(keys), MAX_DYNAMO_BATCH_GET_ITEM_COUNT):
+            for item in self._batch_get(keys[start : start + MAX_DYNAMO_BATCH_GET_ITEM_COUNT]):
+                by_record[item["record_id"]].append(item)
+        return [self._assemble(meta, sorted(by_record[meta["record_id"]], key=lambda t: t["part"])) for meta in metas]
+
+    def _batch_get(self, keys: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Fetch one chunk of items by key, retrying UnprocessedKeys until drained."""
+        items: list[dict[str, Any]] = []
+        request_items = {self._table_name: {"Keys": keys}}
+
+        for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+            response = self._resource().batch_get_item(RequestItems=request_items)
+            items.extend(response.get("Responses", {}).get(self._table_name, []))
+            request_items = response.get("UnprocessedKeys") or {}
+            if not request_items:
+                return items
+            if attempt < BATCH_WRITE_MAX_RETRIES:
+                time.sleep(min(BATCH_WRITE_BACKOFF_MAX, BATCH_WRITE_BACKOFF_BASE * (2**attempt)))
+
+        remaining = sum(len(req["Keys"]) for req in request_items.values())
+        logger.error(f"[loopforge] DynamoDB batch get left {remaining} keys unprocessed")
+        raise RuntimeError(f"DynamoDB batch get left {remaining} keys unprocessed after retries")
+
     def save(self, record: LoopRecord) -> LoopRecord:
+        """
+        Persist a record, writing only transitions not already stored.
+
+        New transition items are written before the header, so a failed
+        save never leaves a header counting transitions that don't exist.
+        The header write is conditional on the stored record not having
+        more transitions than this one: saving a stale copy raises a
+        ConditionalCheckFailedException ClientError instead of moving
+        transition_count backwards.
+        """
         try:
-            self.table.put_item(Item=record.to_dict())
+            response = self.table.get_item(
+                Key={"record_id": record.record_id, "part": META_PART},
+                ProjectionExpression="transition_count",
+                ConsistentRead=True,
+            )
+            stored_count = int(response.get("Item", {}).get("transition_count", 0))
+            *transition_items, meta = self._record_items(record, from_index=stored_count)
+            if transition_items:
+                self._write_requests([{"PutRequest": {"Item": item}} for item in transition_items])
+            self.table.put_item(
+                Item=meta,
+                ConditionExpression="attribute_not_exists(transition_count) OR transition_count <= :count",
+                ExpressionAttributeValues={":count": meta["transition_count"]},
+            )
             return record
         except ClientError as e:
-            logger.error(f"[loopforge] DynamoDB save failed for {record.record_id}: {e}")
+            if e.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException":
+                logger.warning(f"[loopforge] DynamoDB save rejected for {record.record_id}: stored record is newer")
+            else:
+                logger.error(f"[loopforge] DynamoDB save failed for {record.record_id}: {e}")
+            raise
+
+    def save_many(self, records: list[LoopRecord], max_workers: int = 1) -> None:
+        """
+        Persist many records using BatchWriteItem.
+
+        Items are written in chunks of max_batch_size, one round-trip per
+        chunk: first every record's transition items, then, once all of
+        those have succeeded, the header items. As with save(), a failure
+        never leaves a header counting transitions that don't exist.
+        Unlike save(), every transition is (re)written, which is idempotent
+        and avoids a read per record, and headers are written
+        unconditionally; it is intended for bulk ingest, not for records
+        that are concurrently being transitioned. Items DynamoDB reports
+        as unprocessed (e.g. under throttling) are retried with exponential
+        backoff. If a record_id appears more than once, the last occurrence
+        wins, as with repeated save() calls.
+
+        Args:
+            records: Records to persist
+            max_workers: Number of threads issuing BatchWriteItem calls in
+                parallel. As a rule of thumb, budget one worker per ~50
+                writes/s of target throughput. Workers share one client, so
+                going beyond its max_pool_connections (32 by default) adds
+                no concurrency.
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be >= 1, got {max_workers}")
+
+        latest = {record.record_id: record for record in records}
+        transition_requests: list[dict[str, Any]] = []
+        header_requests: list[dict[str, Any]] = []
+        for record in latest.values():
+            *transition_items, meta = self._record_items(record)
+            transition_requests.extend({"PutRequest": {"Item": item}} for item in transition_items)
+            header_requests.append({"PutRequest": {"Item": meta}})
+
+        phases = [self._chunk(transition_requests), self._chunk(header_requests)]
+
+        if max_workers == 1 or all(len(chunks) <= 1 for chunks in phases):
+            for chunks in phases:
+                for chunk in chunks:
+                    self._batch_write(chunk)
+            return
+
+        self._parallel_batch_write(phases, max_workers)
+
+    def _chunk(self, requests: list[dict[str, Any]]) -> list[list[dict[str, Any]]]:
+        size = self._max_batch_size
+        return [requests[start : start + size] for start in range(0, len(requests), size)]
+
+    def _write_requests(self, requests: list[dict[str, Any]]) -> None:
+        for chunk in self._chunk(requests):
+            self._batch_write(chunk)
+
+    def _parallel_batch_write(self, phases: list[list[list[dict[str, Any]]]], max_workers: int) -> None:
+        """
+        Fan chunks out across worker threads, bounding requests in flight.
+
+        Phases run in order on the same pool: every chunk of a phase must
+        succeed before any chunk of the next one is sent.
+        """
+        self._resource()  # create the shared resource up front, not racily in the workers
+        in_flight = threading.BoundedSemaphore(max_workers * BATCH_WRITE_CHUNKS_PER_WORKER)
+        write = self._batch_write
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="loopforge-ddb") as executor:
+            for chunks in phases:
+                futures: list[Future] = []
+                for chunk in chunks:
+                    in_flight.acquire()
+                    future = executor.submit(write, chunk)
+                    future.add_done_callback(lambda _: in_flight.release())
+                    futures.append(future)
+                for future in futures:
+                    future.result()
+
+    def _serialize_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """A put/delete request in the low-level client's typed attribute format."""
+        serialize = self._serializer.serialize
+        if "PutRequest" in request:
+            return {"PutRequest": {"Item": {k: serialize(v) for k, v in request["PutRequest"]["Item"].items()}}}
+        return {"DeleteRequest": {"Key": {k: serialize(v) for k, v in request["DeleteRequest"]["Key"].items()}}}
+
+    def _batch_write(self, requests: list[dict[str, Any]]) -> None:
+        """Send one chunk of put/delete requests, retrying UnprocessedItems until drained."""
+        client = self._resource().meta.client
+        request_items = {self._table_name: [self._serialize_request(request) for request in requests]}
+
+        for attempt in range(BATCH_WRITE_MAX_RETRIES + 1):
+            try:
+                response = client.batch_write_item(RequestItems=request_items)
+            except ClientError as e:
+                logger.error(f"[loopforge] DynamoDB batch write failed: {e}")
+                raise
+
+            request_items = response.get("UnprocessedItems") or {}
+            if not request_items:
+                return
+            if attempt < BATCH_WRITE_MAX_RETRIES:
+                time.sleep(min(BATCH_WRITE_BACKOFF_MAX, BATCH_WRITE_BACKOFF_BASE * (2**attempt)))
+
+        remaining = sum(len(reqs) for reqs in request_items.values())
+        logger.error(f"[loopforge] DynamoDB batch write left {remaining} items unprocessed")
+        raise RuntimeError(f"DynamoDB batch write left {remaining} items unprocessed after retries")
+
+    def apply_transition(self, record: LoopRecord, previous_state: LoopState) -> bool:
+        """
+        Persist the record's latest transition in one small transaction.
+
+        Updates the header's state, timestamps and transition counts, and
+        puts the new transition item; nothing else is rewritten, so write
+        size stays constant as history grows. The header update is
+        conditional on the stored state still being previous_state and the
+        stored transition count matching the record's.
+
+        Returns True if applied, False if the stored record had moved on
+        (a concurrent writer got there first).
+        """
+        index = record.archived_transitions + len(record.transitions) - 1
+        update = "SET #s = :new, updated_at = :updated_at, transition_count = :count, archived_transitions = :archived"
+        values: dict[str, Any] = {
+            ":new": LoopState.to_wire(record.state),
+            ":prev": LoopState.to_wire(previous_state),
+            ":updated_at": record.updated_at,
+            ":index": index,
+            ":count": index + 1,
+            ":archived": record.archived_transitions,
+        }
+        if record.closed_at is not None:
+            update += ", closed_at = :closed_at"
+            values[":closed_at"] = record.closed_at
+
+        serialize = self._serializer.serialize
+        transition_item = self._transition_item(record.record_id, index, record.transitions[-1])
+        try:
+            self._resource().meta.client.transact_write_items(
+                TransactItems=[
+                    {
+                        "Update": {
+                            "TableName": self._table_name,
+                            "Key": {"record_id": {"S": record.record_id}, "part": {"S": META_PART}},
+                            "UpdateExpression": update,
+                            "ConditionExpression": "#s = :prev AND transition_count = :index",
+                            "ExpressionAttributeNames": {"#s": "state"},
+                            "ExpressionAttributeValues": {k: serialize(v) for k, v in values.items()},
+                        }
+                    },
+                    {
+                        "Put": {
+                            "TableName": self._table_name,
+                            "Item": {k: serialize(v) for k, v in transition_item.items()},
+                            "ConditionExpression": "attribute_not_exists(#p)",
+                            "ExpressionAttributeNames": {"#p": "part"},
+                        }
+                    },
+                ]
+            )
+            return True
+        except ClientError as e:
+            reasons = e.response.get("CancellationReasons", [])
+            if any(reason.get("Code") == "ConditionalCheckFailed" for reason in reasons):
+                logger.warning(f"[loopforge] DynamoDB transition conflict for {record.record_id}")
+                return False
+            logger.error(f"[loopforge] DynamoDB apply_transition failed for {record.record_id}: {e}")
             raise
 
     def get(self, record_id: str) -> Optional[LoopRecord]:
         try:
-            response = self.table.get_item(Key={"record_id": record_id})
-            item = response.get("Item")
-            if item is None:
+            meta = self.table.get_item(Key={"record_id": record_id, "part": META_PART}).get("Item")
+            if meta is None:
                 return None
-            return LoopRecord.from_dict(item)
+            return self._hydrate(meta)
         except ClientError as e:
             logger.error(f"[loopforge] DynamoDB get failed for {record_id}: {e}")
             raise
 
     def delete(self, record_id: str) -> bool:
         try:
-            self.table.delete_item(Key={"record_id": record_id})
+            keys = [
+                {"record_id": i["record_id"], "part": i["part"]}
+                for i in self._query_partition(record_id, keys_only=True)
+            ]
+            if not keys:
+                return False
+            self._write_requests([{"DeleteRequest": {"Key": key}} for key in keys])
             return True
         except ClientError as e:
             logger.error(f"[loopforge] DynamoDB delete failed for {record_id}: {e}")
             raise
 
-    def list_by_state(self, state: str, limit: int = 100) -> list[LoopRecord]:
+    @overload
+    def iter_by_state(
+        self, state: str, batch_size: int = 100, view_only: Literal[False] = False
+    ) -> Iterator[LoopRecord]: ...
+
+    @overload
+    def iter_by_state(
+        self, state: str, batch_size: int = 100, *, view_only: Literal[True]
+    ) -> Iterator[LoopRecordView]: ...
+
+    def iter_by_state(
+        self, state: str, batch_size: int = 100, view_only: bool = False
+    ) -> Iterator[Union[LoopRecord, LoopRecordView]]:
+        """
+        Stream records in a given state, most recently updated first.
+
+        Pages through the state index batch_size items at a time. Each page
+        costs one index query plus one BatchGetItem per 100 transitions to
+        load, so memory stays bounded by one page and the first record is
+        available after the first page is hydrated. With view_only=True,
+        yields unvalidated LoopRecordViews built from the index items
+        alone, one query per page, with transitions left unloaded (None).
+        """
+        kwargs: dict[str, Any] = {
+            "IndexName": self.STATE_INDEX,
+            "KeyConditionExpression": "#s = :state",
+            "ExpressionAttributeNames": {"#s": "state"},
+            "ExpressionAttributeValues": {":state": state},
+            "Limit": batch_size,
+            "ScanIndexForward": False,
+        }
+        while True:
+            try:
+                response = self.table.query(**kwargs)
+                items = response.get("Items", [])
+                records: list[Union[LoopRecord, LoopRecordView]]
+                if view_only:
+                    records = [LoopRecordView(self._header_data(meta)) for meta in items]
+                else:
+                    records = list(self._hydrate_many(items))
+            except ClientError as e:
+                logger.error(f"[loopforge] DynamoDB iter_by_state failed: {e}")
+                raise
+            yield from records
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
+
+    @overload
+    def list_by_state(self, state: str, limit: int = 100, view_only: Literal[False] = False) -> list[LoopRecord]: ...
+
+    @overload
+    def list_by_state(self, state: str, limit: int = 100, *, view_only: Literal[True]) -> list[LoopRecordView]: ...
+
+    def list_by_state(
+        self, state: str, limit: int = 100, view_only: bool = False
+    ) -> Union[list[LoopRecord], list[LoopRecordView]]:
+        if view_only:
+            return list(islice(self.iter_by_state(state, batch_size=limit, view_only=True), limit))
+        return list(islice(self.iter_by_state(state, batch_size=limit), limit))
+
+    def archive_transition(self, record_id: str, transition: LoopTransition) -> None:
+        """
+        No-op: transitions are already stored as their own items.
+
+        Trimmed transitions stay in the partition under their original
+        sort keys; the header's archived_transitions marks where the
+        recent range starts.
+        """
+
+    def list_archived_transitions(self, record_id: str) -> list[LoopTransition]:
+        """Transitions trimmed from a record's recent history, oldest first."""
         try:
-            response = self.table.query(
-                IndexName=self.STATE_INDEX,
-                KeyConditionExpression="#s = :state",
-                ExpressionAttributeNames={"#s": "state"},
-                ExpressionAttributeValues={":state": state},
-                Limit=limit,
-                ScanIndexForward=False,
+            response = self.table.get_item(
+                Key={"record_id": record_id, "part": META_PART},
+                ProjectionExpression="archived_transitions",
             )
-            return [LoopRecord.from_dict(item) for item in response.get("Items", [])]
+            archived = int(response.get("Item", {}).get("archived_transitions", 0))
+            items = self._query_transitions(record_id, 0, archived)
         except ClientError as e:
-            logger.error(f"[loopforge] DynamoDB list_by_state failed: {e}")
+            logger.error(f"[loopforge] DynamoDB list_archived_transitions failed for {record_id}: {e}")
             raise
+        return [LoopTransition(**{k: v for k, v in item.items() if k not in ("record_id", "part")}) for item in items]
@@ -5,9 +5,11 @@ Implement this protocol to plug in any storage backend
 (DynamoDB, Postgres, SQLite, Redis, in-memory, etc.).
 """
 
-from typing import Optional, Protocol, runtime_checkable
+from collections import defaultdict
+from itertools import islice
+from typing import Literal, Optional, Protocol, Union, overload, runtime_checkable
 
-from loopforge.states import LoopRecord
+from loopforge.states import LoopRecord, LoopRecordView, LoopState, LoopTransition, _copy_record
 
 
 @runtime_checkable
@@ -18,6 +20,22 @@ class Repository(Protocol):
     Implement this protocol to use any backend. LoopForge ships
     with an in-memory implementation for testing and a DynamoDB
     adapter as an optional extra.
+
+    Backends may additionally implement
+    ``apply_transition(record, previous_state) -> bool`` to persist a
+    single transition incrementally. LoopService uses it in place of
+    save() when present; it should return False if the stored record
+    is no longer in previous_state or has gained transitions since it
+    was loaded.
+
+    To support LoopService(max_recent_transitions=...), backends also
+    implement ``archive_transition(record_id, transition) -> None``,
+    which receives each transition trimmed from a record's recent
+    history, oldest first, once the trimmed record has been persisted.
+
+    Backends with a read-only fast path accept
+    ``list_by_state(state, limit, view_only=True)`` and return
+    LoopRecordView objects instead of validated LoopRecords.
     """
 
     def save(self, record: LoopRecord) -> LoopRecord:
@@ -41,31 +59,69 @@ class MemoryRepository:
     """
     In-memory repository for testing and prototyping.
 
+    Records are stored as LoopRecord objects. By default save() and get()
+    hand out copies, so callers see the same "persisted snapshot"
+    semantics as a real backend. Pass copy=False to store and return the
+    caller's objects directly, which is much faster for read-heavy
+    benchmarks but means in-place changes are visible without save().
+
     Not thread-safe. Not for production use.
     """
 
-    def __init__(self) -> None:
-        self._store: dict[str, dict] = {}
+    def __init__(self, copy: bool = True) -> None:
+        self._copy = copy
+        self._store: dict[str, LoopRecord] = {}
+        # record ID -> state it is indexed under (records may be mutated in place when copy=False)
+        self._indexed_state: dict[str, str] = {}
+        # state -> record IDs in that state (a dict used as an insertion-ordered set)
+        self._by_state: defaultdict[str, dict[str, None]] = defaultdict(dict)
+        self._archive: defaultdict[str, list[LoopTransition]] = defaultdict(list)
+
+    def _snapshot(self, record: LoopRecord) -> LoopRecord:
+        if not self._copy:
+            return record
+        return _copy_record(record)
 
     def save(self, record: LoopRecord) -> LoopRecord:
-        self._store[record.record_id] = record.to_dict()
+        state = LoopState.to_wire(record.state)
+        previous_state = self._indexed_state.get(record.record_id)
+        if previous_state is not None and previous_state != state:
+            self._by_state[previous_state].pop(record.record_id, None)
+        self._store[record.record_id] = self._snapshot(record)
+        self._indexed_state[record.record_id] = state
+        self._by_state[state][record.record_id] = None
         return record
 
     def get(self, record_id: str) -> Optional[LoopRecord]:
-        data = self._store.get(record_id)
-        if data is None:
+        stored = self._store.get(record_id)
+        if stored is None:
             return None
-        return LoopRecord.from_dict(data)
+        return self._snapshot(stored)
 
     def delete(self, record_id: str) -> bool:
-        if record_id in self._store:
-            del self._store[record_id]
-            return True
-        return False
-
-    def list_by_state(self, state: str, limit: int = 100) -> list[LoopRecord]:
-        results = []
-        for data in self._store.values():
-            if data.get("state") == state and len(results) < limit:
-                results.append(LoopRecord.from_dict(data))
-        return results
+        if self._store.pop(record_id, None) is None:
+            return False
+        self._by_state[self._indexed_state.pop(record_id)].pop(record_id, None)
+        self._archive.pop(record_id, None)
+        return True
+
+    @overload
+    def list_by_state(self, state: str, limit: int = 100, view_only: Literal[False] = False) -> list[LoopRecord]: ...
+
+    @overload
+    def list_by_state(self, state: str, limit: int = 100, *, view_only: Literal[True]) -> list[LoopRecordView]: ...
+
+    def list_by_state(
+        self, state: str, limit: int = 100, view_only: bool = False
+    ) -> Union[list[LoopRecord], list[LoopRecordView]]:
+        record_ids = islice(self._by_state.get(state, {}), limit)
+        if view_only:
+            return [LoopRecordView(self._store[record_id].to_dict()) for record_id in record_ids]
+        return [self._snapshot(self._store[record_id]) for record_id in record_ids]
+
+    def archive_transition(self, record_id: str, transition: LoopTransition) -> None:
+        self._archive[record_id].append(transition)
+
+    def list_archived_transitions(self, record_id: str) -> list[LoopTransition]:
+        """Transitions trimmed from a record's recent history, oldest first."""
+        return list(self._archive.get(record_id, ()))
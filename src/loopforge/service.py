@@ -6,11 +6,13 @@ Bring your own Repository implementation.
 """
 
 import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable, Optional
 
 from loopforge.repository import Repository
-from loopforge.states import LoopRecord, LoopState, VALID_TRANSITIONS
+from loopforge.states import _ALLOWED_STR, LoopRecord, LoopState, LoopTransition, _copy_record
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +32,37 @@ class TransitionResult:
 TransitionHook = Callable[[LoopRecord, LoopState, LoopState, str], None]
 
 
+def _no_hooks(record: LoopRecord, previous_state: LoopState, new_state: LoopState, trigger: str) -> None:
+    return None
+
+
+def _hook_name(hook: TransitionHook) -> str:
+    return getattr(hook, "__qualname__", None) or repr(hook)
+
+
+def _build_dispatch(hooks: list[TransitionHook]) -> TransitionHook:
+    """
+    Compile hooks into one callable that runs each of them in order.
+
+    The hooks (and their names, for logging) are captured in a tuple, so a
+    transition pays for one call and a tuple walk rather than re-reading
+    the service's hook list. With no hooks it is a no-op function. A
+    failing hook is logged and skipped; the rest still run.
+    """
+    if not hooks:
+        return _no_hooks
+    named = tuple((hook, _hook_name(hook)) for hook in hooks)
+
+    def dispatch(record: LoopRecord, previous_state: LoopState, new_state: LoopState, trigger: str) -> None:
+        for hook, name in named:
+            try:
+                hook(record, previous_state, new_state, trigger)
+            except Exception as e:
+                logger.warning("[loopforge] Hook %s failed: %s", name, e)
+
+    return dispatch
+
+
 class LoopService:
     """
     Service for managing LoopRecord state transitions.
@@ -40,6 +73,21 @@ class LoopService:
     Supports optional hooks that fire on successful transitions,
     useful for audit logging, notifications, webhooks, etc.
 
+    With max_recent_transitions set, each record keeps at most that many
+    transitions in its `transitions` list; older ones are handed to the
+    repository's archive_transition() so record size (and so the cost of
+    every save) stays bounded for long-lived, flapping records.
+
+    With hooks_async=True, hooks run on a pool of hook_workers threads
+    instead of inside transition(), so a slow webhook doesn't add to
+    transition latency. Each transition's hooks still run in order, on a
+    snapshot of the record taken at that transition. At most
+    max_pending_hooks transitions can be waiting for their hooks. Past
+    that, hooks for new transitions are dropped and logged, and
+    dropped_hooks counts them. Call close() to wait for pending hooks and
+    stop the workers; hooks for transitions made after close() are
+    dropped the same way.
+
     Example:
         from loopforge import LoopService, LoopState, create_record
         from loopforge.repository import MemoryRepository
@@ -61,17 +109,56 @@ class LoopService:
         self,
         repository: Repository,
         hooks: Optional[list[TransitionHook]] = None,
+        max_recent_transitions: Optional[int] = None,
+        hooks_async: bool = False,
+        hook_workers: int = 4,
+        max_pending_hooks: int = 1000,
     ) -> None:
+        if max_recent_transitions is not None:
+            if max_recent_transitions < 1:
+                raise ValueError(f"max_recent_transitions must be >= 1, got {max_recent_transitions}")
+            if not hasattr(repository, "archive_transition"):
+                raise ValueError("max_recent_transitions requires a repository with archive_transition()")
         self._repository = repository
         self._hooks: list[TransitionHook] = hooks or []
+        self._dispatch = _build_dispatch(self._hooks)
+        self._max_recent_transitions = max_recent_transitions
+
+        self._hook_executor: Optional[ThreadPoolExecutor] = None
+        if hooks_async:
+            if hook_workers < 1:
+                raise ValueError(f"hook_workers must be >= 1, got {hook_workers}")
+            if max_pending_hooks < 1:
+                raise ValueError(f"max_pending_hooks must be >= 1, got {max_pending_hooks}")
+            self._hook_executor = ThreadPoolExecutor(max_workers=hook_workers, thread_name_prefix="loopforge-hooks")
+        self._max_pending_hooks = max_pending_hooks
+        self._pending_lock = threading.Lock()
+        self._pending_hooks = 0
+        self._dropped_hooks = 0
 
     @property
     def repository(self) -> Repository:
         return self._repository
 
+    @property
+    def pending_hooks(self) -> int:
+        """Transitions whose async hooks are queued or running."""
+        return self._pending_hooks
+
+    @property
+    def dropped_hooks(self) -> int:
+        """Transitions whose async hooks were dropped (queue full, or submitted after close())."""
+        return self._dropped_hooks
+
+    def close(self) -> None:
+        """Wait for pending async hooks to finish and stop the hook workers."""
+        if self._hook_executor is not None:
+            self._hook_executor.shutdown(wait=True)
+
     def add_hook(self, hook: TransitionHook) -> None:
         """Register a hook that fires after each successful transition."""
         self._hooks.append(hook)
+        self._dispatch = _build_dispatch(self._hooks)
 
     def transition(
         self,
@@ -86,8 +173,9 @@ class LoopService:
         1. Loads the record from the repository
         2. Validates the transition against the state machine
         3. Records the transition in history
-        4. Persists the updated record
-        5. Fires any registered hooks
+        4. Persists the updated record (via the repository's
+           apply_transition() if it has one, otherwise save())
+        5. Fires any registered hooks (or queues them, with hooks_async)
 
         Args:
             record_id: The record identifier
@@ -110,14 +198,12 @@ class LoopService:
         previous_state = record.state
 
         if not record.can_transition_to(new_state):
-            allowed = VALID_TRANSITIONS.get(previous_state, [])
-            allowed_str = ", ".join(s.value for s in allowed) if allowed else "none (terminal)"
             return TransitionResult(
                 success=False,
                 record=record,
                 error=(
                     f"Invalid transition: {previous_state.value} → {new_state.value}. "
-                    f"Allowed from {previous_state.value}: {allowed_str}"
+                    f"Allowed from {previous_state.value}: {_ALLOWED_STR[previous_state]}"
                 ),
                 previous_state=previous_state,
             )
@@ -131,15 +217,39 @@ class LoopService:
                 previous_state=previous_state,
             )
 
-        self._repository.save(record)
-
-        logger.info(f"[loopforge] {record_id}: {previous_state.value} → {new_state.value} ({trigger})")
+        trimmed = self._trim_overflow(record)
+
+        # Repositories that support it persist just the appended transition,
+        # conditional on the stored record being unchanged since get() (same
+        # state and transition count), instead of rewriting the record.
+        apply_transition = getattr(self._repository, "apply_transition", None)
+        if apply_transition is not None:
+            if not apply_transition(record, previous_state):
+                return TransitionResult(
+                    success=False,
+                    record=self._repository.get(record_id),
+                    error=(
+                        f"Concurrent modification: {record_id} was changed by another writer "
+                        f"since it was loaded in state {previous_state.value}"
+                    ),
+                    previous_state=previous_state,
+                )
+        else:
+            self._repository.save(record)
+
+        # Archived only once the trimmed record is stored, so a failed write
+        # never leaves transitions in both the archive and the record.
+        for transition in trimmed:
+            self._repository.archive_transition(record_id, transition)
+
+        logger.info(
+            f"[loopforge] {record_id}: {LoopState.to_wire(previous_state)} → {LoopState.to_wire(new_state)} ({trigger})"
+        )
 
-        for hook in self._hooks:
-            try:
-                hook(record, previous_state, new_state, trigger)
-            except Exception as e:
-                logger.warning(f"[loopforge] Hook error: {e}")
+        if self._hook_executor is None:
+            self._dispatch(record, previous_state, new_state, trigger)
+        elif self._dispatch is not _no_hooks:
+            self._submit_hooks(record, previous_state, new_state, trigger)
 
         return TransitionResult(
             success=True,
@@ -148,6 +258,60 @@ class LoopService:
             new_state=new_state,
         )
 
+    def _submit_hooks(self, record: LoopRecord, previous_state: LoopState, new_state: LoopState, trigger: str) -> None:
+        """Queue this transition's hooks on the hook executor, or drop them if it is saturated."""
+        with self._pending_lock:
+            saturated = self._pending_hooks >= self._max_pending_hooks
+            if saturated:
+                self._dropped_hooks += 1
+            else:
+                self._pending_hooks += 1
+        if saturated:
+            logger.warning(
+                "[loopforge] Hook queue full (%d pending), dropping hooks for %s: %s → %s",
+                self._max_pending_hooks,
+                record.record_id,
+                LoopState.to_wire(previous_state),
+                LoopState.to_wire(new_state),
+            )
+            return
+
+        # The caller may keep transitioning this record while hooks run, so
+        # give them their own copy.
+        snapshot = _copy_record(record)
+        try:
+            future = self._hook_executor.submit(self._dispatch, snapshot, previous_state, new_state, trigger)
+        except RuntimeError:
+            # close() already stopped the workers. The transition itself is
+            # persisted, so drop its hooks rather than fail the caller.
+            with self._pending_lock:
+                self._pending_hooks -= 1
+                self._dropped_hooks += 1
+            logger.warning(
+                "[loopforge] Hook workers closed, dropping hooks for %s: %s → %s",
+                record.record_id,
+                LoopState.to_wire(previous_state),
+                LoopState.to_wire(new_state),
+            )
+            return
+        future.add_done_callback(self._hooks_done)
+
+    def _hooks_done(self, future: Future) -> None:
+        with self._pending_lock:
+            self._pending_hooks -= 1
+
+    def _trim_overflow(self, record: LoopRecord) -> list[LoopTransition]:
+        """Remove and return the oldest transitions beyond max_recent_transitions."""
+        if self._max_recent_transitions is None:
+            return []
+        overflow = len(record.transitions) - self._max_recent_transitions
+        if overflow <= 0:
+            return []
+        trimmed = record.transitions[:overflow]
+        del record.transitions[:overflow]
+        record.archived_transitions += overflow
+        return trimmed
+
     def get(self, record_id: str) -> Optional[LoopRecord]:
         """Get a record by ID."""
         return self._repository.get(record_id)
@@ -5,12 +5,13 @@ Defines states, transitions, and records for tracking work items
 through the issue → PR → CI → merge → close pipeline.
 """
 
-from datetime import datetime, timezone
+import secrets
+import time
+from dataclasses import dataclass, field, replace
 from enum import Enum
 from typing import Any, Optional
-from uuid import uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class LoopState(str, Enum):
@@ -27,6 +28,24 @@ class LoopState(str, Enum):
     MERGED = "merged"
     CLOSED = "closed"
 
+    @staticmethod
+    def to_wire(state: "LoopState") -> str:
+        """The state's serialized string (a table lookup, cheaper than .value)."""
+        return _TO_WIRE[state]
+
+    @staticmethod
+    def from_wire(value: str) -> "LoopState":
+        """Parse a serialized state string (a table lookup, cheaper than LoopState(value))."""
+        try:
+            return _FROM_WIRE[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a valid LoopState") from None
+
+
+# Lookup tables between states and their serialized strings, in both directions.
+_TO_WIRE: dict[LoopState, str] = {state: state.value for state in LoopState}
+_FROM_WIRE: dict[str, LoopState] = {state.value: state for state in LoopState}
+
 
 VALID_TRANSITIONS: dict[LoopState, list[LoopState]] = {
     LoopState.ISSUE_CREATED: [LoopState.TASK_QUEUED],
@@ -41,20 +60,77 @@ VALID_TRANSITIONS: dict[LoopState, list[LoopState]] = {
     LoopState.CLOSED: [],
 }
 
+# Hashed lookup tables derived from VALID_TRANSITIONS at import time.
+VALID_TRANSITIONS_SET: dict[LoopState, frozenset[LoopState]] = {
+    state: frozenset(targets) for state, targets in VALID_TRANSITIONS.items()
+}
+
+# Human-readable allowed targets per state, for error messages.
+_ALLOWED_STR: dict[LoopState, str] = {
+    state: ", ".join(t.value for t in targets) or "none (terminal)" for state, targets in VALID_TRANSITIONS.items()
+}
+
+
+# Serializes free-form transition metadata exactly as model_dump(mode="json")
+# would (datetimes to ISO strings, tuples to lists, enums to values, ...).
+_METADATA_ADAPTER: TypeAdapter[dict[str, Any]] = TypeAdapter(dict[str, Any])
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last _now() call.
+_now_prefix: tuple[int, str] = (-1, "")
+
 
 def _now() -> str:
-    """UTC timestamp in ISO 8601 format."""
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    """
+    UTC timestamp in ISO 8601 format with microseconds.
 
+    Formats from time.time_ns() directly, reusing the date/time prefix
+    while calls land within the same second.
+    """
+    global _now_prefix
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_seconds, prefix = _now_prefix
+    if seconds != cached_seconds:
+        t = time.gmtime(seconds)
+        prefix = f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}"
+        _now_prefix = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}Z"
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class LoopTransition:
+    """
+    Record of a single state transition.
+
+    A slotted dataclass rather than a pydantic model: transitions are
+    append-only audit entries created on every state change, so they skip
+    validation on construction. LoopRecord validates them when loading.
+    The fields are frozen, but metadata is a plain dict; transition_to()
+    copies the caller's dict so later changes to it don't leak in.
+
+    Attributes:
+        from_state: Previous state (None for initial)
+        to_state: New state
+        trigger: Event that triggered the transition
+        timestamp: When the transition occurred (ISO 8601)
+        metadata: Additional context
+    """
 
-class LoopTransition(BaseModel):
-    """Record of a single state transition."""
+    from_state: Optional[str] = None
+    to_state: str
+    trigger: str
+    timestamp: str = field(default_factory=_now)
+    metadata: dict[str, Any] = field(default_factory=dict)
 
-    from_state: Optional[str] = Field(default=None, description="Previous state (None for initial)")
-    to_state: str = Field(..., description="New state")
-    trigger: str = Field(..., description="Event that triggered the transition")
-    timestamp: str = Field(default_factory=_now, description="When the transition occurred (ISO 8601)")
-    metadata: dict[str, Any] = Field(default_factory=dict, description="Additional context")
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to a plain dict (for storage adapters)."""
+        return {
+            "from_state": self.from_state,
+            "to_state": self.to_state,
+            "trigger": self.trigger,
+            "timestamp": self.timestamp,
+            "metadata": _METADATA_ADAPTER.dump_python(self.metadata, mode="json") if self.metadata else {},
+        }
 
 
 class LoopRecord(BaseModel):
@@ -65,7 +141,7 @@ class LoopRecord(BaseModel):
     transition history, and metadata about the work item.
     """
 
-    record_id: str = Field(default_factory=lambda: f"loop-{uuid4().hex[:8]}", description="Unique record ID")
+    record_id: str = Field(default_factory=lambda: f"loop-{secrets.token_hex(4)}", description="Unique record ID")
     ref: str = Field(..., description="External reference (issue URL, ticket ID, etc.)")
     ref_number: Optional[int] = Field(default=None, description="Numeric reference (issue number, etc.)")
     repo: Optional[str] = Field(default=None, description="Repository identifier (e.g. owner/repo)")
@@ -75,6 +151,9 @@ class LoopRecord(BaseModel):
     auto_merge: bool = Field(default=False, description="Whether to auto-merge when CI passes")
     ci_status: dict[str, str] = Field(default_factory=dict, description="CI check statuses")
     transitions: list[LoopTransition] = Field(default_factory=list, description="Transition history")
+    archived_transitions: int = Field(
+        default=0, description="Number of older transitions moved out of `transitions` into the repository's archive"
+    )
     labels: dict[str, str] = Field(default_factory=dict, description="User-defined labels/tags")
     created_at: str = Field(default_factory=_now, description="Creation timestamp")
     updated_at: str = Field(default_factory=_now, description="Last update timestamp")
@@ -82,7 +161,7 @@ class LoopRecord(BaseModel):
 
     def can_transition_to(self, new_state: LoopState) -> bool:
         """Check if a transition to new_state is valid."""
-        return new_state in VALID_TRANSITIONS.get(self.state, [])
+        return new_state in VALID_TRANSITIONS_SET[self.state]
 
     def transition_to(
         self,
@@ -95,31 +174,60 @@ class LoopRecord(BaseModel):
 
         Returns True if the transition succeeded, False if invalid.
         """
-        if not self.can_transition_to(new_state):
+        # Same check as can_transition_to(), inlined: this is the hot path.
+        if new_state not in VALID_TRANSITIONS_SET[self.state]:
             return False
 
+        # One timestamp for the transition, updated_at and closed_at, so they always agree.
+        ts = _now()
         self.transitions.append(
             LoopTransition(
-                from_state=self.state.value,
-                to_state=new_state.value,
+                from_state=_TO_WIRE[self.state],
+                to_state=_TO_WIRE[new_state],
                 trigger=trigger,
-                metadata=metadata or {},
+                timestamp=ts,
+                metadata=dict(metadata) if metadata else {},
             )
         )
 
         self.state = new_state
-        self.updated_at = _now()
+        self.updated_at = ts
 
         if new_state == LoopState.CLOSED:
-            self.closed_at = _now()
+            self.closed_at = ts
 
         return True
 
     def to_dict(self) -> dict[str, Any]:
-        """Serialize to a plain dict (for storage adapters)."""
-        data = self.model_dump(mode="json")
-        data["state"] = self.state.value
-        return data
+        """
+        Serialize to a plain dict (for storage adapters).
+
+        Built field by field rather than via model_dump(), which walks the
+        model through pydantic's serializer on every save. Only transition
+        metadata, which is free-form, still goes through pydantic's JSON
+        serializer, so the result matches model_dump(mode="json").
+        Subclasses that declare extra fields fall back to model_dump().
+        """
+        cls = type(self)
+        if cls is not LoopRecord and cls.model_fields.keys() != LoopRecord.model_fields.keys():
+            return self.model_dump(mode="json")
+        return {
+            "record_id": self.record_id,
+            "ref": self.ref,
+            "ref_number": self.ref_number,
+            "repo": self.repo,
+            "pr_url": self.pr_url,
+            "pr_number": self.pr_number,
+            "state": _TO_WIRE[self.state],
+            "auto_merge": self.auto_merge,
+            "ci_status": dict(self.ci_status),
+            "transitions": [t.to_dict() for t in self.transitions],
+            "archived_transitions": self.archived_transitions,
+            "labels": dict(self.labels),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "closed_at": self.closed_at,
+        }
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "LoopRecord":
@@ -127,6 +235,99 @@ class LoopRecord(BaseModel):
         return cls.model_validate(data)
 
 
+def _copy_record(record: LoopRecord) -> LoopRecord:
+    """
+    Copy of a record that shares no mutable state with the original.
+
+    Copies the dict and list fields and each transition's metadata, which
+    is several times cheaper than model_copy(deep=True).
+    """
+    return record.model_copy(
+        update={
+            "ci_status": dict(record.ci_status),
+            "labels": dict(record.labels),
+            "transitions": [replace(t, metadata=dict(t.metadata)) for t in record.transitions],
+        }
+    )
+
+
+def _int_or_none(value: Any) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+class LoopRecordView:
+    """
+    Read-only, unvalidated view of a stored LoopRecord.
+
+    Built straight from a stored dict (the shape LoopRecord.to_dict()
+    produces) without pydantic validation, for read paths such as
+    dashboards and list-by-state pagers that only look at records.
+
+    state is parsed to a LoopState, and numeric fields are coerced to
+    int (DynamoDB returns Decimal). Everything else is taken as stored;
+    in particular transitions are plain dicts. transitions is None when
+    the view was built without them: the DynamoDB adapter builds listing
+    views from the header item alone, skipping the transition reads.
+    Call to_record() for a validated LoopRecord that can be transitioned
+    and saved; that needs the transitions to have been loaded.
+    """
+
+    __slots__ = (
+        "record_id",
+        "ref",
+        "ref_number",
+        "repo",
+        "pr_url",
+        "pr_number",
+        "state",
+        "auto_merge",
+        "ci_status",
+        "transitions",
+        "archived_transitions",
+        "labels",
+        "created_at",
+        "updated_at",
+        "closed_at",
+    )
+
+    def __init__(self, data: dict[str, Any]) -> None:
+        self.record_id: str = data["record_id"]
+        self.ref: str = data["ref"]
+        self.ref_number = _int_or_none(data.get("ref_number"))
+        self.repo: Optional[str] = data.get("repo")
+        self.pr_url: Optional[str] = data.get("pr_url")
+        self.pr_number = _int_or_none(data.get("pr_number"))
+        self.state = LoopState.from_wire(data["state"])
+        self.auto_merge: bool = data.get("auto_merge", False)
+        self.ci_status: dict[str, str] = data.get("ci_status") or {}
+        self.transitions: Optional[list[dict[str, Any]]] = data.get("transitions")
+        self.archived_transitions = int(data.get("archived_transitions", 0))
+        self.labels: dict[str, str] = data.get("labels") or {}
+        self.created_at: str = data["created_at"]
+        self.updated_at: str = data["updated_at"]
+        self.closed_at: Optional[str] = data.get("closed_at")
+
+    def to_dict(self) -> dict[str, Any]:
+        """The view as a plain dict, in LoopRecord.to_dict() form."""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["state"] = _TO_WIRE[self.state]
+        return data
+
+    def to_record(self) -> LoopRecord:
+        """Validate into a full LoopRecord."""
+        if self.transitions is None:
+            raise ValueError(f"Transitions of {self.record_id} were not loaded; fetch the record with get()")
+        return LoopRecord.from_dict(self.to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LoopRecordView):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"LoopRecordView(record_id={self.record_id!r}, state={self.state.value!r})"
+
+
 def create_record(
     ref: str,
     ref_number: Optional[int] = None,
@@ -147,19 +348,27 @@ def create_record(
     Returns:
         A new LoopRecord with the initial transition recorded.
     """
+    # One timestamp for created_at, updated_at and the initial transition.
+    # Passing it in also saves the two default-factory _now() calls.
+    ts = _now()
     record = LoopRecord(
         ref=ref,
         ref_number=ref_number,
         repo=repo,
         auto_merge=auto_merge,
         labels=labels or {},
+        created_at=ts,
+        updated_at=ts,
     )
 
+    # Appended after construction rather than passed in, so pydantic doesn't
+    # re-validate the transition we just built.
     record.transitions.append(
         LoopTransition(
             from_state=None,
-            to_state=LoopState.ISSUE_CREATED.value,
+            to_state=_TO_WIRE[LoopState.ISSUE_CREATED],
             trigger="created",
+            timestamp=ts,
             metadata={"ref": ref, "repo": repo},
         )
     )
@@ -0,0 +1,96 @@
+"""
+Binary wire format for LoopRecords.
+
+Requires the `wire` extra: pip install loopforge[wire]
+
+Records are encoded as msgpack and framed with a 4-byte big-endian
+length prefix, so a receiver reading from a stream (socket, queue
+payload, file) knows exactly how many bytes to read without scanning
+for delimiters. Storage adapters that need Python dicts (e.g. DynamoDB)
+should keep using LoopRecord.to_dict(); this is for transport.
+
+Usage:
+    from loopforge.wire import to_bytes, from_bytes
+
+    frame = to_bytes(record)
+    restored = from_bytes(frame)
+"""
+
+import struct
+from collections.abc import Iterator
+from typing import BinaryIO, Optional
+
+from loopforge.states import LoopRecord
+
+try:
+    import msgpack
+except ImportError:
+    raise ImportError("msgpack is required for the wire format. Install it with: pip install loopforge[wire]")
+
+HEADER = struct.Struct(">I")
+
+
+def to_bytes(record: LoopRecord) -> bytes:
+    """Encode a record as a length-prefixed msgpack frame."""
+    payload = msgpack.packb(record.to_dict(), use_bin_type=True)
+    return HEADER.pack(len(payload)) + payload
+
+
+def from_bytes(frame: bytes) -> LoopRecord:
+    """Decode a single length-prefixed frame produced by to_bytes()."""
+    if len(frame) < HEADER.size:
+        raise ValueError(f"Truncated frame: expected at least {HEADER.size} header bytes, got {len(frame)}")
+    (length,) = HEADER.unpack_from(frame)
+    if len(frame) - HEADER.size != length:
+        raise ValueError(f"Frame length mismatch: header says {length} bytes, got {len(frame) - HEADER.size}")
+    return _decode(memoryview(frame)[HEADER.size :])
+
+
+def iter_frames(buffer: bytes) -> Iterator[LoopRecord]:
+    """Decode every record from a buffer of back-to-back frames."""
+    view = memoryview(buffer)
+    offset = 0
+    while offset < len(view):
+        if len(view) - offset < HEADER.size:
+            raise ValueError("Truncated frame header at end of buffer")
+        (length,) = HEADER.unpack_from(view, offset)
+        start = offset + HEADER.size
+        end = start + length
+        if end > len(view):
+            raise ValueError(f"Truncated frame: header says {length} bytes, {len(view) - start} available")
+        yield _decode(view[start:end])
+        offset = end
+
+
+def read_record(stream: BinaryIO) -> Optional[LoopRecord]:
+    """
+    Read one frame from a binary stream.
+
+    Returns None on a clean end of stream (no bytes left before the header).
+    """
+    header = _read_exactly(stream, HEADER.size)
+    if header is None:
+        return None
+    (length,) = HEADER.unpack(header)
+    payload = _read_exactly(stream, length)
+    if payload is None:
+        raise ValueError(f"Stream ended before {length}-byte frame payload")
+    return _decode(payload)
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> Optional[bytes]:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ValueError(f"Stream ended mid-frame ({size - remaining} of {size} bytes read)")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _decode(payload: bytes | memoryview) -> LoopRecord:
+    return LoopRecord.from_dict(msgpack.unpackb(payload, raw=False))
@@ -0,0 +1,562 @@
+"""Tests for the DynamoDB adapter (against an in-process fake resource)."""
+
+import threading
+
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+
+from boto3.dynamodb.types import TypeDeserializer  # noqa: E402
+from botocore.config import Config  # noqa: E402
+from botocore.exceptions import ClientError  # noqa: E402
+from botocore.stub import Stubber  # noqa: E402
+
+from loopforge.adapters.dynamodb import DynamoDBRepository  # noqa: E402
+from loopforge.service import LoopService  # noqa: E402
+from loopforge.states import LoopRecordView, LoopState, create_record  # noqa: E402
+
+
+class FakeResource:
+    """
+    Minimal stand-in for boto3's DynamoDB service resource and table.
+
+    Items are keyed on (record_id, part). Partition queries return
+    page_size items per page to exercise pagination.
+    """
+
+    def __init__(self, unprocessed_rounds: int = 0, page_size: int = 2) -> None:
+        self.items: dict[tuple[str, str], dict] = {}
+        self.batch_calls: list[int] = []
+        self.transactions: list[list[dict]] = []
+        self.puts = 0
+        self.index_queries = 0
+        self.partition_queries = 0
+        self.batch_gets: list[int] = []
+        self._unprocessed_rounds = unprocessed_rounds
+        self._page_size = page_size
+        self.meta = self
+        self.client = self
+
+    def Table(self, name):
+        return self
+
+    def records(self):
+        return {record_id for record_id, part in self.items if part == "meta"}
+
+    def put_item(self, Item, ConditionExpression=None, ExpressionAttributeValues=None):
+        self.puts += 1
+        key = (Item["record_id"], Item["part"])
+        if ConditionExpression is not None:
+            stored = self.items.get(key, {})
+            if stored.get("transition_count", 0) > ExpressionAttributeValues[":count"]:
+                raise ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "PutItem")
+        self.items[key] = Item
+
+    def get_item(self, Key, **kwargs):
+        item = self.items.get((Key["record_id"], Key["part"]))
+        return {"Item": item} if item is not None else {}
+
+    def query(self, ExpressionAttributeValues, IndexName=None, Limit=None, ExclusiveStartKey=None, **kwargs):
+        values = ExpressionAttributeValues
+        if IndexName:
+            self.index_queries += 1
+            matches = [i for i in self.items.values() if i.get("state") == values[":state"]]
+            matches.sort(key=lambda i: (i["updated_at"], i["record_id"]), reverse=True)
+            if ExclusiveStartKey:
+                position = [i["record_id"] for i in matches].index(ExclusiveStartKey["record_id"])
+                matches = matches[position + 1 :]
+            response = {"Items": matches[:Limit]}
+            if len(matches) > Limit:
+                response["LastEvaluatedKey"] = {"record_id": matches[Limit - 1]["record_id"]}
+            return response
+
+        first, last = values.get(":first", ""), values.get(":last", "\uffff")
+        self.partition_queries += 1
+        matches = sorted(
+            (i for (rid, part), i in self.items.items() if rid == values[":id"] and first <= part <= last),
+            key=lambda i: i["part"],
+        )
+        if ExclusiveStartKey:
+            matches = [i for i in matches if i["part"] > ExclusiveStartKey["part"]]
+        page = matches[: self._page_size]
+        response = {"Items": page}
+        if len(matches) > self._page_size:
+            response["LastEvaluatedKey"] = {"record_id": values[":id"], "part": page[-1]["part"]}
+        return response
+
+    def batch_get_item(self, RequestItems):
+        ((table, request),) = RequestItems.items()
+        self.batch_gets.append(len(request["Keys"]))
+        found = [
+            self.items[(k["record_id"], k["part"])]
+            for k in request["Keys"]
+            if (k["record_id"], k["part"]) in self.items
+        ]
+        # BatchGetItem returns items in no particular order
+        return {"Responses": {table: found[::-1]}, "UnprocessedKeys": {}}
+
+    def batch_write_item(self, RequestItems):
+        deserialize = TypeDeserializer().deserialize
+        ((table, requests),) = RequestItems.items()
+        self.batch_calls.append(len(requests))
+        unprocessed = []
+        if self._unprocessed_rounds:
+            self._unprocessed_rounds -= 1
+            requests, unprocessed = requests[:-1], requests[-1:]
+        for req in requests:
+            if "PutRequest" in req:
+                item = {k: deserialize(v) for k, v in req["PutRequest"]["Item"].items()}
+                self.items[(item["record_id"], item["part"])] = item
+            else:
+                key = {k: deserialize(v) for k, v in req["DeleteRequest"]["Key"].items()}
+                self.items.pop((key["record_id"], key["part"]), None)
+        return {"UnprocessedItems": {table: unprocessed} if unprocessed else {}}
+
+    def transact_write_items(self, TransactItems):
+        deserialize = TypeDeserializer().deserialize
+        update, put = TransactItems[0]["Update"], TransactItems[1]["Put"]
+        key = tuple(deserialize(update["Key"][k]) for k in ("record_id", "part"))
+        values = {k: deserialize(v) for k, v in update["ExpressionAttributeValues"].items()}
+        item = {k: deserialize(v) for k, v in put["Item"].items()}
+
+        meta = self.items.get(key)
+        if (
+            meta is None
+            or meta["state"] != values[":prev"]
+            or meta["transition_count"] != values[":index"]
+            or (item["record_id"], item["part"]) in self.items
+        ):
+            raise ClientError(
+                {
+                    "Error": {"Code": "TransactionCanceledException"},
+                    "CancellationReasons": [{"Code": "ConditionalCheckFailed"}],
+                },
+                "TransactWriteItems",
+            )
+
+        self.transactions.append(TransactItems)
+        meta.update(
+            state=values[":new"],
+            updated_at=values[":updated_at"],
+            transition_count=values[":count"],
+            archived_transitions=values[":archived"],
+        )
+        if ":closed_at" in values:
+            meta["closed_at"] = values[":closed_at"]
+        self.items[(item["record_id"], item["part"])] = item
+
+
+class ThreadRecordingResource(FakeResource):
+    """FakeResource that records which threads sent batch writes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: set[str] = set()
+        self._lock = threading.Lock()
+
+    def batch_write_item(self, RequestItems):
+        with self._lock:
+            self.threads.add(threading.current_thread().name)
+            return super().batch_write_item(RequestItems)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr("loopforge.adapters.dynamodb.time.sleep", lambda s: None)
+
+
+@pytest.fixture
+def resource():
+    return FakeResource()
+
+
+@pytest.fixture
+def repo(resource):
+    return DynamoDBRepository(table_name="t", client=resource)
+
+
+def advance(record, *states):
+    for state in states:
+        assert record.transition_to(state, f"to.{state.value}")
+    return record
+
+
+class TestItemLayout:
+    def test_save_splits_header_and_transitions(self, repo, resource):
+        record = advance(create_record(ref="issue-1"), LoopState.TASK_QUEUED)
+
+        repo.save(record)
+
+        meta = resource.items[(record.record_id, "meta")]
+        assert "transitions" not in meta
+        assert meta["transition_count"] == 2
+        assert resource.items[(record.record_id, "txn#00000000")]["trigger"] == "created"
+        assert resource.items[(record.record_id, "txn#00000001")]["to_state"] == "task_queued"
+
+    def test_get_reassembles_across_pages(self, repo):
+        record = advance(
+            create_record(ref="issue-1"), LoopState.TASK_QUEUED, LoopState.PR_CREATED, LoopState.CI_PENDING
+        )
+        repo.save(record)
+
+        assert repo.get(record.record_id) == record
+
+    def test_resave_writes_only_new_transitions(self, repo, resource):
+        record = create_record(ref="issue-1")
+        repo.save(record)
+        advance(record, LoopState.TASK_QUEUED)
+        resource.batch_calls.clear()
+
+        repo.save(record)
+
+        assert resource.batch_calls == [1]
+        assert repo.get(record.record_id) == record
+
+    def test_get_missing(self, repo):
+        assert repo.get("nope") is None
+
+    def test_delete_removes_all_items(self, repo, resource):
+        record = advance(create_record(ref="issue-1"), LoopState.TASK_QUEUED, LoopState.PR_CREATED)
+        repo.save(record)
+
+        assert repo.delete(record.record_id) is True
+        assert resource.items == {}
+        assert repo.delete(record.record_id) is False
+
+    def test_list_by_state_hydrates_transitions(self, repo):
+        queued = advance(create_record(ref="issue-1"), LoopState.TASK_QUEUED)
+        repo.save(queued)
+        repo.save(create_record(ref="issue-2"))
+
+        listed = repo.list_by_state("task_queued")
+
+        assert listed == [queued]
+
+    def test_list_by_state_view_only(self, repo):
+        queued = advance(create_record(ref="issue-1"), LoopState.TASK_QUEUED)
+        repo.save(queued)
+
+        (view,) = repo.list_by_state("task_queued", view_only=True)
+
+        assert isinstance(view, LoopRecordView)
+        assert view.record_id == queued.record_id
+        assert view.state == LoopState.TASK_QUEUED
+        assert view.updated_at == queued.updated_at
+
+    def test_view_only_reads_headers_alone(self, repo, resource):
+        for i in range(5):
+            repo.save(advance(create_record(ref=f"issue-{i}"), LoopState.TASK_QUEUED))
+        resource.partition_queries = 0
+
+        views = repo.list_by_state("task_queued", view_only=True)
+
+        assert len(views) == 5
+        assert all(view.transitions is None for view in views)
+        assert resource.index_queries == 1
+        assert resource.batch_gets == []
+        assert resource.partition_queries == 0
+        with pytest.raises(ValueError, match="not loaded"):
+            views[0].to_record()
+
+
+class TestIterByState:
+    def test_pages_through_index(self, repo, resource):
+        records = [repo.save(create_record(ref=f"issue-{i}")) for i in range(5)]
+
+        streamed = list(repo.iter_by_state("issue_created", batch_size=2))
+
+        assert {r.record_id for r in streamed} == {r.record_id for r in records}
+        assert resource.index_queries == 3
+
+    def test_is_lazy(self, repo, resource):
+        for i in range(5):
+            repo.save(create_record(ref=f"issue-{i}"))
+
+        first = next(repo.iter_by_state("issue_created", batch_size=2))
+
+        assert first.state == LoopState.ISSUE_CREATED
+        assert resource.index_queries == 1
+
+    def test_page_hydrates_with_one_batch_get(self, repo, resource):
+        records = [
+            repo.save(advance(create_record(ref=f"issue-{i}"), LoopState.TASK_QUEUED, LoopState.PR_CREATED))
+            for i in range(20)
+        ]
+        resource.partition_queries = 0
+
+        listed = repo.list_by_state("pr_created", limit=20)
+
+        assert {r.record_id for r in listed} == {r.record_id for r in records}
+        assert all(
+            [t.to_state for t in r.transitions] == ["issue_created", "task_queued", "pr_created"] for r in listed
+        )
+        assert resource.index_queries == 1
+        assert resource.batch_gets == [60]
+        assert resource.partition_queries == 0
+
+    def test_batch_gets_are_chunked(self, repo, resource):
+        for i in range(60):
+            repo.save(advance(create_record(ref=f"issue-{i}"), LoopState.TASK_QUEUED))
+
+        assert len(repo.list_by_state("task_queued", limit=60)) == 60
+        assert resource.batch_gets == [100, 20]
+
+    def test_list_by_state_stops_at_limit(self, repo, resource):
+        for i in range(5):
+            repo.save(create_record(ref=f"issue-{i}"))
+
+        assert len(repo.list_by_state("issue_created", limit=3)) == 3
+        assert resource.index_queries == 1
+
+
+class TestSaveMany:
+    def test_chunks_into_25_item_batches(self, repo, resource):
+        records = [create_record(ref=f"issue-{i}") for i in range(60)]
+
+        repo.save_many(records)
+
+        # initial transition items first, then the headers
+        assert resource.batch_calls == [25, 25, 10, 25, 25, 10]
+        assert resource.records() == {r.record_id for r in records}
+
+    def test_max_batch_size_is_configurable(self, resource):
+        repo = DynamoDBRepository(table_name="t", client=resource, max_batch_size=100)
+
+        repo.save_many([create_record(ref=f"issue-{i}") for i in range(75)])
+
+        assert resource.batch_calls == [75, 75]
+
+    def test_retries_unprocessed_items(self):
+        resource = FakeResource(unprocessed_rounds=2)
+        repo = DynamoDBRepository(table_name="t", client=resource)
+        records = [create_record(ref=f"issue-{i}") for i in range(3)]
+
+        repo.save_many(records)
+
+        assert resource.batch_calls == [3, 1, 1, 3]
+        assert resource.records() == {r.record_id for r in records}
+
+    def test_gives_up_after_max_retries(self):
+        resource = FakeResource(unprocessed_rounds=100)
+        repo = DynamoDBRepository(table_name="t", client=resource)
+
+        with pytest.raises(RuntimeError, match="unprocessed"):
+            repo.save_many([create_record(ref="issue-1")])
+
+    def test_duplicate_ids_last_write_wins(self, repo, resource):
+        record = create_record(ref="issue-1")
+        updated = record.model_copy(update={"ref": "issue-1-renamed"})
+
+        repo.save_many([record, updated])
+
+        assert resource.batch_calls == [1, 1]
+        assert resource.items[(record.record_id, "meta")]["ref"] == "issue-1-renamed"
+
+
+class TestParallelSaveMany:
+    def test_fans_chunks_across_threads(self):
+        resource = ThreadRecordingResource()
+        repo = DynamoDBRepository(table_name="t", client=resource)
+        records = [create_record(ref=f"issue-{i}") for i in range(130)]
+
+        repo.save_many(records, max_workers=4)
+
+        assert sorted(resource.batch_calls) == [5, 5] + [25] * 10
+        assert resource.records() == {r.record_id for r in records}
+        assert threading.main_thread().name not in resource.threads
+
+    def test_workers_use_injected_resource(self, monkeypatch):
+        monkeypatch.delenv("AWS_DEFAULT_REGION", raising=False)
+        resource = boto3.resource(
+            "dynamodb",
+            endpoint_url="http://localhost:8000",
+            region_name="us-west-2",
+            aws_access_key_id="local",
+            aws_secret_access_key="local",
+        )
+        repo = DynamoDBRepository(table_name="t", client=resource)
+        with Stubber(resource.meta.client) as stubber:
+            for _ in range(4):
+                stubber.add_response("batch_write_item", {"UnprocessedItems": {}})
+
+            repo.save_many([create_record(ref=f"issue-{i}") for i in range(30)], max_workers=2)
+
+            stubber.assert_no_pending_responses()
+
+    def test_headers_written_only_after_transitions(self):
+        class FailingTransitions(FakeResource):
+            def batch_write_item(self, RequestItems):
+                ((table, requests),) = RequestItems.items()
+                if any(r["PutRequest"]["Item"]["part"]["S"] != "meta" for r in requests):
+                    raise RuntimeError("throttled")
+                return super().batch_write_item(RequestItems)
+
+        failing = FailingTransitions()
+        repo = DynamoDBRepository(table_name="t", client=failing)
+
+        with pytest.raises(RuntimeError, match="throttled"):
+            repo.save_many([create_record(ref=f"issue-{i}") for i in range(60)], max_workers=2)
+
+        assert failing.records() == set()
+
+    def test_worker_errors_propagate(self):
+        class FailingResource(FakeResource):
+            def batch_write_item(self, RequestItems):
+                raise RuntimeError("throttled")
+
+        repo = DynamoDBRepository(table_name="t", client=FailingResource())
+
+        with pytest.raises(RuntimeError, match="throttled"):
+            repo.save_many([create_record(ref=f"issue-{i}") for i in range(60)], max_workers=2)
+
+
+class TestApplyTransition:
+    def test_transition_writes_one_transaction(self, repo, resource):
+        service = LoopService(repository=repo)
+        record = service.create(ref="issue-1")
+        puts = resource.puts
+
+        result = service.transition(record.record_id, LoopState.TASK_QUEUED, "worker.picked_up")
+
+        assert result.success is True
+        assert len(resource.transactions) == 1
+        assert resource.puts == puts
+        stored = repo.get(record.record_id)
+        assert stored.state == LoopState.TASK_QUEUED
+        assert [t.trigger for t in stored.transitions] == ["created", "worker.picked_up"]
+
+    def test_closing_sets_closed_at(self, repo):
+        service = LoopService(repository=repo)
+        record = service.create(ref="issue-1")
+        for state in (
+            LoopState.TASK_QUEUED,
+            LoopState.PR_CREATED,
+            LoopState.CI_PENDING,
+            LoopState.CI_PASSED,
+            LoopState.MERGED,
+            LoopState.CLOSED,
+        ):
+            assert service.transition(record.record_id, state, "t").success
+
+        stored = repo.get(record.record_id)
+        assert stored.closed_at is not None
+        assert len(stored.transitions) == 7
+
+    def test_condition_failure_returns_false(self, repo, resource):
+        record = create_record(ref="issue-1")
+        repo.save(record)
+        advance(record, LoopState.TASK_QUEUED)
+
+        assert repo.apply_transition(record, LoopState.CI_PENDING) is False
+        assert resource.items[(record.record_id, "meta")]["state"] == "issue_created"
+        assert (record.record_id, "txn#00000001") not in resource.items
+
+
+class TestStaleSave:
+    def test_stale_save_is_rejected(self, repo, resource):
+        service = LoopService(repository=repo)
+        record = service.create(ref="issue-1")
+        stale = repo.get(record.record_id)
+        assert service.transition(record.record_id, LoopState.TASK_QUEUED, "t").success
+
+        stale.pr_url = "u"
+        with pytest.raises(ClientError):
+            repo.save(stale)
+
+        assert resource.items[(record.record_id, "meta")]["transition_count"] == 2
+        assert service.transition(record.record_id, LoopState.PR_CREATED, "t").success
+
+    def test_save_of_current_copy_succeeds(self, repo):
+        service = LoopService(repository=repo)
+        record = service.create(ref="issue-1")
+        assert service.transition(record.record_id, LoopState.TASK_QUEUED, "t").success
+
+        current = repo.get(record.record_id)
+        current.pr_url = "u"
+        repo.save(current)
+
+        assert repo.get(record.record_id).pr_url == "u"
+
+
+class TestArchivedTransitions:
+    def test_trimmed_transitions_stay_in_partition(self, repo, resource):
+        service = LoopService(repo, max_recent_transitions=2)
+        record = service.create(ref="issue-1")
+        for state in (LoopState.TASK_QUEUED, LoopState.PR_CREATED, LoopState.CI_PENDING):
+            assert service.transition(record.record_id, state, "t").success
+
+        meta = resource.items[(record.record_id, "meta")]
+        assert meta["transition_count"] == 4
+        assert meta["archived_transitions"] == 2
+        assert len(resource.items) == 5
+
+        loaded = repo.get(record.record_id)
+        assert loaded.archived_transitions == 2
+        assert [t.to_state for t in loaded.transitions] == ["pr_created", "ci_pending"]
+        assert [t.to_state for t in repo.list_archived_transitions(record.record_id)] == [
+            "issue_created",
+            "task_queued",
+        ]
+
+    def test_get_reads_only_recent_range(self, repo, resource):
+        record = advance(
+            create_record(ref="issue-1"), LoopState.TASK_QUEUED, LoopState.PR_CREATED, LoopState.CI_PENDING
+        )
+        repo.save(record)
+        del record.transitions[:3]
+        record.archived_transitions = 3
+        repo.save(record)
+        resource.partition_queries = 0
+
+        loaded = repo.get(record.record_id)
+
+        assert loaded == record
+        assert resource.partition_queries == 1
+
+    def test_save_after_trim_writes_only_new_transitions(self, repo, resource):
+        record = advance(create_record(ref="issue-1"), LoopState.TASK_QUEUED)
+        repo.save(record)
+        advance(record, LoopState.PR_CREATED)
+        del record.transitions[:2]
+        record.archived_transitions = 2
+        resource.batch_calls.clear()
+
+        repo.save(record)
+
+        assert resource.batch_calls == [1]
+        assert resource.items[(record.record_id, "txn#00000002")]["to_state"] == "pr_created"
+        assert repo.get(record.record_id) == record
+
+
+class TestClientConfig:
+    def test_default_resource_uses_tuned_config(self, monkeypatch):
+        created = {}
+
+        def fake_resource(service, **kwargs):
+            created.update(kwargs, service=service)
+            return FakeResource()
+
+        monkeypatch.setattr("loopforge.adapters.dynamodb.boto3.resource", fake_resource)
+        DynamoDBRepository(table_name="t", region_name="eu-west-1").table
+
+        config = created["config"]
+        assert created["service"] == "dynamodb"
+        assert created["region_name"] == "eu-west-1"
+        assert config.tcp_keepalive is True
+        assert config.max_pool_connections == 32
+        assert config.retries == {"mode": "adaptive", "total_max_attempts": 10}
+
+    def test_config_overrides_merge_with_defaults(self, monkeypatch):
+        created = {}
+
+        def fake_resource(service, **kwargs):
+            created.update(kwargs)
+            return FakeResource()
+
+        monkeypatch.setattr("loopforge.adapters.dynamodb.boto3.resource", fake_resource)
+        DynamoDBRepository(table_name="t", config=Config(read_timeout=30)).table
+
+        config = created["config"]
+        assert config.read_timeout == 30
+        assert config.max_pool_connections == 32
+        assert config.retries["mode"] == "adaptive"
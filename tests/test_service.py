@@ -1,8 +1,10 @@
 """Tests for the LoopService."""
 
+import threading
+
 import pytest
 
-from loopforge.states import LoopState
+from loopforge.states import LoopState, create_record
 from loopforge.repository import MemoryRepository
 from loopforge.service import LoopService
 
@@ -53,6 +55,7 @@ class TestLoopService:
         result = service.transition(record.record_id, LoopState.MERGED, "bad")
         assert result.success is False
         assert "Invalid transition" in result.error
+        assert "Allowed from issue_created: task_queued" in result.error
 
     def test_transition_with_metadata(self, service):
         record = service.create(ref="issue-1")
@@ -118,6 +121,108 @@ class TestHooks:
         result = service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
         assert result.success is True
 
+    def test_failing_hook_doesnt_stop_later_hooks(self, service, caplog):
+        calls = []
+
+        def bad_hook(record, prev, new, trigger):
+            raise RuntimeError("hook exploded")
+
+        service.add_hook(bad_hook)
+        service.add_hook(lambda r, p, n, t: calls.append(n))
+        record = service.create(ref="issue-1")
+
+        with caplog.at_level("WARNING", logger="loopforge.service"):
+            service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        assert calls == [LoopState.TASK_QUEUED]
+        assert "bad_hook failed: hook exploded" in caplog.text
+
+    def test_hooks_fire_in_registration_order(self, repo):
+        calls = []
+        service = LoopService(repo, hooks=[lambda r, p, n, t: calls.append("first")])
+        service.add_hook(lambda r, p, n, t: calls.append("second"))
+        record = service.create(ref="issue-1")
+
+        service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        assert calls == ["first", "second"]
+
+
+class TestAsyncHooks:
+    def test_transition_doesnt_wait_for_hooks(self, repo):
+        release = threading.Event()
+        calls = []
+
+        def slow_hook(record, prev, new, trigger):
+            release.wait()
+            calls.append((record.state, new))
+
+        service = LoopService(repo, hooks=[slow_hook], hooks_async=True)
+        record = service.create(ref="issue-1")
+
+        result = service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        assert result.success is True
+        assert calls == []
+        assert service.pending_hooks == 1
+        release.set()
+        service.close()
+        assert calls == [(LoopState.TASK_QUEUED, LoopState.TASK_QUEUED)]
+        assert service.pending_hooks == 0
+
+    def test_hooks_see_snapshot_of_their_transition(self, repo):
+        seen = []
+        service = LoopService(
+            repo,
+            hooks=[lambda r, p, n, t: seen.append(len(r.transitions))],
+            hooks_async=True,
+            hook_workers=1,
+        )
+        record = service.create(ref="issue-1")
+        service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+        service.transition(record.record_id, LoopState.PR_CREATED, "t")
+        service.close()
+
+        assert seen == [2, 3]
+
+    def test_drops_when_queue_is_full(self, repo):
+        release = threading.Event()
+        service = LoopService(
+            repo,
+            hooks=[lambda r, p, n, t: release.wait()],
+            hooks_async=True,
+            max_pending_hooks=1,
+        )
+        record = service.create(ref="issue-1")
+        service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        result = service.transition(record.record_id, LoopState.PR_CREATED, "t")
+
+        assert result.success is True
+        assert service.dropped_hooks == 1
+        release.set()
+        service.close()
+
+    def test_transition_after_close_drops_hooks(self, repo):
+        calls = []
+        service = LoopService(repo, hooks=[lambda r, p, n, t: calls.append(n)], hooks_async=True)
+        record = service.create(ref="issue-1")
+        service.close()
+
+        result = service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        assert result.success is True
+        assert repo.get(record.record_id).state == LoopState.TASK_QUEUED
+        assert calls == []
+        assert service.dropped_hooks == 1
+        assert service.pending_hooks == 0
+
+    def test_rejects_invalid_settings(self, repo):
+        with pytest.raises(ValueError):
+            LoopService(repo, hooks_async=True, hook_workers=0)
+        with pytest.raises(ValueError):
+            LoopService(repo, hooks_async=True, max_pending_hooks=0)
+
 
 class TestMemoryRepository:
     def test_list_by_state(self, repo, service):
@@ -137,3 +242,172 @@ class TestMemoryRepository:
 
     def test_delete_nonexistent(self, repo):
         assert repo.delete("nope") is False
+
+    def test_list_by_state_follows_transitions(self, repo, service):
+        record = service.create(ref="a")
+        service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+        service.transition(record.record_id, LoopState.PR_CREATED, "t")
+
+        assert repo.list_by_state("issue_created") == []
+        assert repo.list_by_state("task_queued") == []
+        assert [r.record_id for r in repo.list_by_state("pr_created")] == [record.record_id]
+
+    def test_list_by_state_respects_limit_and_order(self, repo, service):
+        records = [service.create(ref=str(i)) for i in range(5)]
+        listed = repo.list_by_state("issue_created", limit=3)
+        assert [r.record_id for r in listed] == [r.record_id for r in records[:3]]
+
+    def test_list_by_state_view_only(self, repo, service):
+        record = service.create(ref="a")
+        service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        (view,) = repo.list_by_state("task_queued", view_only=True)
+
+        assert view.record_id == record.record_id
+        assert view.state == LoopState.TASK_QUEUED
+        assert view.to_record() == repo.get(record.record_id)
+
+    def test_delete_removes_from_state_listing(self, repo, service):
+        record = service.create(ref="a")
+        repo.delete(record.record_id)
+        assert repo.list_by_state("issue_created") == []
+
+
+class IncrementalRepository(MemoryRepository):
+    """MemoryRepository with a conditional apply_transition, like the DynamoDB adapter."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.applied = []
+        self.saves = 0
+
+    def save(self, record):
+        self.saves += 1
+        return super().save(record)
+
+    def apply_transition(self, record, previous_state):
+        stored = super().get(record.record_id)
+        if stored.state != previous_state:
+            return False
+        self.applied.append((record.record_id, previous_state, record.state))
+        super().save(record)
+        return True
+
+
+class TestApplyTransition:
+    def test_uses_apply_transition_when_available(self):
+        repo = IncrementalRepository()
+        service = LoopService(repository=repo)
+        record = service.create(ref="issue-1")
+
+        result = service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        assert result.success is True
+        assert repo.applied == [(record.record_id, LoopState.ISSUE_CREATED, LoopState.TASK_QUEUED)]
+        assert repo.saves == 1  # create only
+        assert repo.get(record.record_id).state == LoopState.TASK_QUEUED
+
+    def test_conflict_reports_failure(self, monkeypatch):
+        repo = IncrementalRepository()
+        service = LoopService(repository=repo)
+        record = service.create(ref="issue-1")
+        stale = repo.get(record.record_id)
+        service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        # Another writer moved the record on after we loaded it
+        monkeypatch.setattr(repo, "get", lambda record_id: stale if record_id == record.record_id else None)
+        result = service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+
+        assert result.success is False
+        assert "Concurrent modification" in result.error
+        assert len(repo.applied) == 1
+
+
+class TestMemoryRepositoryCopies:
+    def test_saved_record_is_isolated_from_caller(self, repo):
+        record = create_record(ref="a", labels={"env": "prod"})
+        repo.save(record)
+        record.labels["env"] = "dev"
+        record.transition_to(LoopState.TASK_QUEUED, "t")
+
+        stored = repo.get(record.record_id)
+        assert stored.labels == {"env": "prod"}
+        assert stored.state == LoopState.ISSUE_CREATED
+        assert len(stored.transitions) == 1
+
+    def test_fetched_record_is_isolated_from_store(self, repo):
+        record = repo.save(create_record(ref="a"))
+        fetched = repo.get(record.record_id)
+        fetched.transition_to(LoopState.TASK_QUEUED, "t")
+        assert repo.get(record.record_id).state == LoopState.ISSUE_CREATED
+
+    def test_transition_metadata_is_isolated_from_store(self, repo):
+        record = repo.save(create_record(ref="a"))
+        repo.get(record.record_id).transitions[0].metadata["ref"] = "edited"
+        assert repo.get(record.record_id).transitions[0].metadata["ref"] == "a"
+
+    def test_copy_false_shares_objects(self):
+        repo = MemoryRepository(copy=False)
+        record = repo.save(create_record(ref="a"))
+        assert repo.get(record.record_id) is record
+
+        record.transition_to(LoopState.TASK_QUEUED, "t")
+        repo.save(record)
+        assert repo.list_by_state("issue_created") == []
+        assert repo.list_by_state("task_queued") == [record]
+
+
+class TestMaxRecentTransitions:
+    def test_trims_oldest_into_archive(self, repo):
+        service = LoopService(repo, max_recent_transitions=2)
+        record = service.create(ref="a")
+        for state in (LoopState.TASK_QUEUED, LoopState.PR_CREATED, LoopState.CI_PENDING):
+            assert service.transition(record.record_id, state, "t").success
+
+        stored = repo.get(record.record_id)
+        assert [t.to_state for t in stored.transitions] == ["pr_created", "ci_pending"]
+        assert stored.archived_transitions == 2
+        assert [t.to_state for t in repo.list_archived_transitions(record.record_id)] == [
+            "issue_created",
+            "task_queued",
+        ]
+
+    def test_archives_only_after_successful_write(self):
+        repo = IncrementalRepository()
+        service = LoopService(repo, max_recent_transitions=1)
+        record = service.create(ref="a")
+        stale = repo.get(record.record_id)
+        assert service.transition(record.record_id, LoopState.TASK_QUEUED, "t").success
+        assert len(repo.list_archived_transitions(record.record_id)) == 1
+
+        # A conflicting write must not archive anything
+        repo.get = lambda record_id: stale.model_copy(deep=True)
+        assert not service.transition(record.record_id, LoopState.TASK_QUEUED, "t").success
+        assert len(repo.list_archived_transitions(record.record_id)) == 1
+
+    def test_unbounded_by_default(self, service, repo):
+        record = service.create(ref="a")
+        service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+        assert len(repo.get(record.record_id).transitions) == 2
+        assert repo.list_archived_transitions(record.record_id) == []
+
+    def test_delete_drops_archive(self, repo):
+        service = LoopService(repo, max_recent_transitions=1)
+        record = service.create(ref="a")
+        service.transition(record.record_id, LoopState.TASK_QUEUED, "t")
+        repo.delete(record.record_id)
+        assert repo.list_archived_transitions(record.record_id) == []
+
+    def test_rejects_invalid_limit(self, repo):
+        with pytest.raises(ValueError):
+            LoopService(repo, max_recent_transitions=0)
+
+    def test_requires_archiving_repository(self):
+        class PlainRepository:
+            def save(self, record): ...
+            def get(self, record_id): ...
+            def delete(self, record_id): ...
+            def list_by_state(self, state, limit=100): ...
+
+        with pytest.raises(ValueError, match="archive_transition"):
+            LoopService(PlainRepository(), max_recent_transitions=5)
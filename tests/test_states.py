@@ -1,11 +1,20 @@
 """Tests for the core state machine."""
 
+import dataclasses
+import re
+from decimal import Decimal
+from datetime import datetime, timezone
+
 import pytest
 
 from loopforge.states import (
     LoopState,
     LoopRecord,
+    LoopRecordView,
+    LoopTransition,
     VALID_TRANSITIONS,
+    VALID_TRANSITIONS_SET,
+    _now,
     create_record,
 )
 
@@ -22,6 +31,16 @@ class TestLoopState:
         for state, targets in VALID_TRANSITIONS.items():
             assert LoopState.ISSUE_CREATED not in targets
 
+    def test_wire_helpers_roundtrip(self):
+        for state in LoopState:
+            assert LoopState.to_wire(state) == state.value
+            assert type(LoopState.to_wire(state)) is str
+            assert LoopState.from_wire(state.value) is state
+
+    def test_from_wire_rejects_unknown(self):
+        with pytest.raises(ValueError, match="not a valid LoopState"):
+            LoopState.from_wire("shipped")
+
 
 class TestLoopRecord:
     def test_create_record_defaults(self):
@@ -46,6 +65,15 @@ class TestLoopRecord:
         assert record.auto_merge is True
         assert record.labels == {"team": "platform"}
 
+    def test_record_ids_are_8_hex_digits(self):
+        ids = {create_record(ref="issue-1").record_id for _ in range(100)}
+        assert len(ids) == 100
+        assert all(re.fullmatch(r"loop-[0-9a-f]{8}", record_id) for record_id in ids)
+
+    def test_create_record_uses_one_timestamp(self):
+        record = create_record(ref="issue-1")
+        assert record.created_at == record.updated_at == record.transitions[0].timestamp
+
     def test_can_transition_to_valid(self):
         record = create_record(ref="test")
         assert record.can_transition_to(LoopState.TASK_QUEUED) is True
@@ -77,6 +105,7 @@ class TestLoopRecord:
         record.transition_to(LoopState.CLOSED, "t")
         assert record.closed_at is not None
         assert record.state == LoopState.CLOSED
+        assert record.closed_at == record.updated_at == record.transitions[-1].timestamp
 
     def test_full_happy_path(self):
         record = create_record(ref="issue-1", repo="org/repo")
@@ -149,3 +178,101 @@ class TestValidTransitions:
     def test_transition_validity(self, from_state, to_state, expected):
         record = LoopRecord(ref="test", state=from_state)
         assert record.can_transition_to(to_state) is expected
+
+
+class TestSerialization:
+    def test_to_dict_matches_model_dump(self):
+        record = create_record(ref="test", ref_number=7, repo="org/repo", labels={"env": "prod"})
+        record.transition_to(LoopState.TASK_QUEUED, "t", {"worker": "w-1"})
+        assert record.to_dict() == record.model_dump(mode="json")
+
+    def test_field_lists_agree(self):
+        record = create_record(ref="test")
+        assert set(LoopRecord.model_fields) == set(LoopRecordView.__slots__) == set(record.to_dict())
+
+    def test_to_dict_keeps_subclass_fields(self):
+        class TeamRecord(LoopRecord):
+            team: str = "core"
+
+        record = TeamRecord(ref="test", team="infra")
+
+        assert record.to_dict() == record.model_dump(mode="json")
+        assert record.to_dict()["team"] == "infra"
+
+    def test_to_dict_serializes_non_json_metadata(self):
+        record = create_record(ref="test")
+        at = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        record.transition_to(LoopState.TASK_QUEUED, "t", {"at": at, "pair": (1, 2), "state": LoopState.CI_PASSED})
+
+        data = record.to_dict()
+
+        assert data == record.model_dump(mode="json")
+        assert data["transitions"][-1]["metadata"] == {
+            "at": "2024-01-02T03:04:05Z",
+            "pair": [1, 2],
+            "state": "ci_passed",
+        }
+
+
+class TestLoopRecordView:
+    def test_round_trips_through_record(self):
+        record = create_record(ref="test", ref_number=7, repo="org/repo", labels={"env": "prod"})
+        record.transition_to(LoopState.TASK_QUEUED, "t", {"worker": "w-1"})
+
+        view = LoopRecordView(record.to_dict())
+
+        assert view.state is LoopState.TASK_QUEUED
+        assert view.transitions[-1]["to_state"] == "task_queued"
+        assert view.to_dict() == record.to_dict()
+        assert view.to_record() == record
+
+    def test_coerces_numbers(self):
+        data = create_record(ref="test", ref_number=7).to_dict()
+        data.update(ref_number=Decimal(7), archived_transitions=Decimal(2))
+
+        view = LoopRecordView(data)
+
+        assert type(view.ref_number) is int and view.ref_number == 7
+        assert type(view.archived_transitions) is int
+        assert view.pr_number is None
+
+    def test_is_slotted(self):
+        view = LoopRecordView(create_record(ref="test").to_dict())
+        with pytest.raises(AttributeError):
+            view.extra = 1
+
+
+class TestTransitionTables:
+    def test_set_table_matches_valid_transitions(self):
+        assert VALID_TRANSITIONS_SET == {s: frozenset(t) for s, t in VALID_TRANSITIONS.items()}
+
+
+class TestNow:
+    def test_matches_datetime_isoformat(self):
+        before = datetime.now(timezone.utc)
+        stamp = _now()
+        after = datetime.now(timezone.utc)
+        assert re.fullmatch(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z", stamp)
+        assert before <= datetime.fromisoformat(stamp) <= after
+
+
+class TestLoopTransition:
+    def test_is_immutable(self):
+        record = create_record(ref="test")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            record.transitions[0].trigger = "edited"
+
+    def test_copies_caller_metadata(self):
+        record = create_record(ref="test")
+        meta = {"worker": "w-1"}
+        record.transition_to(LoopState.TASK_QUEUED, "t", meta)
+
+        meta["worker"] = "w-2"
+
+        assert record.transitions[-1].metadata == {"worker": "w-1"}
+
+    def test_validated_from_dict_on_load(self):
+        record = create_record(ref="test")
+        restored = LoopRecord.from_dict(record.to_dict())
+        assert isinstance(restored.transitions[0], LoopTransition)
+        assert restored.transitions[0] == record.transitions[0]
@@ -0,0 +1,46 @@
+"""Tests for the length-prefixed binary wire format."""
+
+import io
+
+import pytest
+
+pytest.importorskip("msgpack")
+
+from loopforge.states import LoopState, create_record  # noqa: E402
+from loopforge.wire import HEADER, from_bytes, iter_frames, read_record, to_bytes  # noqa: E402
+
+
+@pytest.fixture
+def record():
+    record = create_record(ref="issue-1", repo="org/repo", labels={"env": "prod"})
+    record.transition_to(LoopState.TASK_QUEUED, "worker.picked_up", {"worker_id": "w-1"})
+    return record
+
+
+class TestWire:
+    def test_roundtrip(self, record):
+        assert from_bytes(to_bytes(record)) == record
+
+    def test_frame_is_length_prefixed(self, record):
+        frame = to_bytes(record)
+        (length,) = HEADER.unpack_from(frame)
+        assert length == len(frame) - HEADER.size
+
+    def test_from_bytes_rejects_truncated_frame(self, record):
+        with pytest.raises(ValueError, match="mismatch"):
+            from_bytes(to_bytes(record)[:-1])
+
+    def test_iter_frames(self, record):
+        other = create_record(ref="issue-2")
+        decoded = list(iter_frames(to_bytes(record) + to_bytes(other)))
+        assert [r.record_id for r in decoded] == [record.record_id, other.record_id]
+
+    def test_read_record_from_stream(self, record):
+        stream = io.BytesIO(to_bytes(record) * 2)
+        assert read_record(stream) == record
+        assert read_record(stream) == record
+        assert read_record(stream) is None
+
+    def test_read_record_mid_frame_eof(self, record):
+        with pytest.raises(ValueError):
+            read_record(io.BytesIO(to_bytes(record)[:10]))